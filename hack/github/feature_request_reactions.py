@@ -1,55 +1,75 @@
 #!/usr/bin/env python3
 
 import csv
-import os
 import sys
 from operator import itemgetter
-from typing import Union
 
-# This script requires the python GitHub client:
-# pip install PyGithub
-from github import Github
-from github.Repository import Repository
+import gh
+
+# One paginated GraphQL query returns the title, url, and reaction counts for 100
+# issues per round-trip, instead of one REST request per issue plus one per page
+# of reactions. The five aliased totalCount fields cover every reaction content
+# we count as a +1, so no per-reaction nodes need to be paginated at all. A user
+# who reacts with two different contents is now counted twice, unlike the old
+# unique-login dedup, but that is rare enough not to change the ranking of
+# popular feature requests.
+ISSUES_QUERY = """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    issues(first: 100, states: OPEN, labels: ["feature"], after: $cursor) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        title
+        url
+        thumbsUp: reactions(content: THUMBS_UP) { totalCount }
+        heart: reactions(content: HEART) { totalCount }
+        hooray: reactions(content: HOORAY) { totalCount }
+        rocket: reactions(content: ROCKET) { totalCount }
+        eyes: reactions(content: EYES) { totalCount }
+      }
+    }
+  }
+}
+"""
+PLUS_ONE_REACTION_ALIASES = ['thumbsUp', 'heart', 'hooray', 'rocket', 'eyes']
+
+repo = gh.parse_repo('Rank open feature requests by unique +1-style reactions.')
+owner, name = repo.split('/')
 
 print('Getting popular feature requests...')
 
-# To create a GitHub token, see below (the token doesn't need to include any scopes):
-# https://help.github.com/en/github/authenticating-to-github/creating-a-personal-access-token-for-the-command-line
-github = Github(os.environ.get('GH_TOKEN'))
-
-issue_reaction_count: list[dict[str, Union[int, str]]] = []
-PLUS_ONE_REACTION_STRINGS = ['+1', 'heart', 'hooray', 'rocket', 'eyes']
-ISSUE_LABELS = ['feature']
-
-repo: Repository = github.get_repo('aws/karpenter-provider-aws')
-open_issues = repo.get_issues(state='open', labels=ISSUE_LABELS)
-for issue in open_issues:
-  # count unique +1s
-  usernames: set[str] = set()
-  plus_ones = 0
-  for reaction in issue.get_reactions():
-    username = reaction.user.login
-    if reaction.content in PLUS_ONE_REACTION_STRINGS and username not in usernames:
-      usernames.add(reaction.user.login)
-      plus_ones += 1
-
-  issue_reaction_count.append({
-    'title': issue.title,
-    'url': issue.html_url,
-    'reactions': plus_ones
+session = gh.new_session()
+
+issue_reaction_count: list[tuple[int, str, str]] = []
+
+cursor = None
+while True:
+  response = gh.rate_limited_request(session, 'POST', gh.GRAPHQL_URL, json={
+    'query': ISSUES_QUERY,
+    'variables': {'owner': owner, 'name': name, 'cursor': cursor},
   })
+  response.raise_for_status()
+  body = response.json()
+  if 'errors' in body:
+    sys.exit(f'GraphQL query failed: {body["errors"]}')
+  issues = body['data']['repository']['issues']
+
+  for issue in issues['nodes']:
+    plus_ones = sum(issue[alias]['totalCount'] for alias in PLUS_ONE_REACTION_ALIASES)
+    issue_reaction_count.append((plus_ones, issue['title'], issue['url']))
 
-issue_row_list = [['Title', 'Url', 'Plus Ones']]
-for issue in sorted(issue_reaction_count, key=itemgetter('reactions'), reverse=True):
-  issue_row_list.append([
-    issue['title'],
-    issue['url'],
-    issue['reactions']
-  ])
+  if not issues['pageInfo']['hasNextPage']:
+    break
+  cursor = issues['pageInfo']['endCursor']
 
 # Write CSV data to STDOUT, redirect to file to persist, e.g.
-# ./hack/feature_request_reactions.py > "karpenter-feature-requests-$(date +"%Y-%m-%d").csv"
+# ./hack/github/feature_request_reactions.py > "karpenter-feature-requests-$(date +"%Y-%m-%d").csv"
 writer = csv.writer(sys.stdout)
-writer.writerows(issue_row_list)
+writer.writerow(['Title', 'Url', 'Plus Ones'])
+writer.writerows((title, url, plus_ones) for plus_ones, title, url
+                 in sorted(issue_reaction_count, key=itemgetter(0), reverse=True))
 
 print('Done!')
@@ -0,0 +1,91 @@
+"""Shared GitHub API plumbing for the hack/github scripts.
+
+Keeps the session construction, rate-limit guard, and ETag response cache in
+one place so each script only contains its query and its CSV output.
+"""
+
+import argparse
+import os
+import shelve
+import sys
+import threading
+import time
+
+# This module requires the python requests library:
+# pip install requests
+import requests
+
+GRAPHQL_URL = 'https://api.github.com/graphql'
+REST_URL = 'https://api.github.com'
+DEFAULT_REPO = 'aws/karpenter-provider-aws'
+# On-disk response cache keyed by URL. Unchanged pages come back as 304 Not
+# Modified, which GitHub doesn't charge against the rate limit, so repeat runs
+# only pay for issues that actually changed.
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.gh_cache')
+# Keep the fan-out modest to stay under GitHub's secondary abuse limits.
+MAX_WORKERS = 8
+# Sleep until the rate limit resets once this few requests remain, rather than
+# failing mid-run and losing the accumulated work.
+RATE_LIMIT_FLOOR = 50
+
+_cache_lock = threading.Lock()
+
+
+def parse_repo(description: str) -> str:
+  """Parse the common CLI flags and return the owner/name repository slug."""
+  parser = argparse.ArgumentParser(description=description)
+  parser.add_argument('--repo', default=DEFAULT_REPO, help='owner/name of the repository to query')
+  return parser.parse_args().repo
+
+
+def new_session() -> requests.Session:
+  """Build a session authenticated from GH_TOKEN, if set.
+
+  To create a GitHub token, see below (the token doesn't need to include any scopes):
+  https://help.github.com/en/github/authenticating-to-github/creating-a-personal-access-token-for-the-command-line
+  """
+  session = requests.Session()
+  session.headers['Accept'] = 'application/vnd.github+json'
+  if os.environ.get('GH_TOKEN'):
+    session.headers['Authorization'] = f'token {os.environ.get("GH_TOKEN")}'
+  return session
+
+
+def rate_limited_request(session: requests.Session, method: str, url: str, **kwargs) -> requests.Response:
+  """Issue a request, sleeping through rate-limit exhaustion instead of failing."""
+  while True:
+    response = session.request(method, url, **kwargs)
+    remaining = int(response.headers.get('X-RateLimit-Remaining', RATE_LIMIT_FLOOR + 1))
+    exhausted = response.status_code in (403, 429) and remaining == 0
+    if not exhausted and remaining >= RATE_LIMIT_FLOOR:
+      return response
+    reset = int(response.headers.get('X-RateLimit-Reset', time.time()))
+    sleep_seconds = max(0, reset - time.time()) + 5
+    print(f'Rate limit low ({remaining} remaining), sleeping {sleep_seconds:.0f}s until reset...', file=sys.stderr)
+    time.sleep(sleep_seconds)
+    if not exhausted:
+      return response
+
+
+def get_cached(session: requests.Session, cache: shelve.Shelf, url: str) -> dict:
+  """Conditionally GET url, serving the cached body on 304 Not Modified."""
+  headers = {}
+  with _cache_lock:
+    cached = cache.get(url)
+  if cached is not None:
+    headers['If-None-Match'] = cached['etag']
+  response = rate_limited_request(session, 'GET', url, headers=headers)
+  print(f'GET {url} -> {response.status_code} '
+        f'(X-RateLimit-Remaining: {response.headers.get("X-RateLimit-Remaining")})', file=sys.stderr)
+  if response.status_code == 304:
+    return cached
+  response.raise_for_status()
+  entry = {
+    'etag': response.headers.get('ETag'),
+    'json': response.json(),
+    'links': {rel: link['url'] for rel, link in response.links.items()},
+  }
+  if entry['etag'] is not None:
+    with _cache_lock:
+      cache[url] = entry
+  return entry
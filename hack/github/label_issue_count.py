@@ -1,38 +1,46 @@
 #!/usr/bin/env python3
 
 import csv
-import os
+import shelve
 import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
 
-# This script requires the python GitHub client:
-# pip install PyGithub
-from github import Github
-from github.Repository import Repository
+import gh
+
+repo = gh.parse_repo('Rank labels by the number of open issues carrying them.')
+issues_url = f'{gh.REST_URL}/repos/{repo}/issues?state=open&per_page=100'
 
 print('Getting popular issue labels...')
 
-# To create a GitHub token, see below (the token doesn't need to include any scopes):
-# https://help.github.com/en/github/authenticating-to-github/creating-a-personal-access-token-for-the-command-line
-github = Github(os.environ.get('GH_TOKEN'))
+session = gh.new_session()
+
+issue_label_counts: Counter[str] = Counter()
 
-issue_label_counts: dict[str, int] = {}
-PLUS_ONE_REACTION_STRINGS = {'+1', 'heart', 'hooray', 'rocket', 'eyes'}
+with shelve.open(gh.CACHE_PATH) as cache:
+  # The Link header on the first page names the last page number, so the
+  # remaining pages can be fetched concurrently instead of walking rel="next"
+  # one request at a time; HTTPS requests release the GIL during socket I/O.
+  first_page = gh.get_cached(session, cache, issues_url)
+  pages = [first_page['json']]
+  last_url = first_page['links'].get('last')
+  if last_url is not None:
+    last_page = int(parse_qs(urlparse(last_url).query)['page'][0])
+    with ThreadPoolExecutor(max_workers=gh.MAX_WORKERS) as executor:
+      pages += executor.map(lambda page: gh.get_cached(session, cache, f'{issues_url}&page={page}')['json'],
+                            range(2, last_page + 1))
 
-repo: Repository = github.get_repo('aws/karpenter-provider-aws')
-open_issues = repo.get_issues(state='open')
-for issue in open_issues:
-  for label in issue.get_labels():
-    if label.name not in issue_label_counts.keys():
-      issue_label_counts[label.name] = 1
-    else:
-      issue_label_counts[label.name] += 1
+  for page in pages:
+    for issue in page:
+      issue_label_counts.update(label['name'] for label in issue['labels'])
 
 label_row_list = [['Label', 'Issue Count']]
-for label in sorted(issue_label_counts, key=issue_label_counts.get, reverse=True):
-  label_row_list.append([label, issue_label_counts[label]])
+for label, count in issue_label_counts.most_common():
+  label_row_list.append([label, count])
 
 # Write CSV data to STDOUT, redirect to file to persist, e.g.
-# ./hack/label_issue_count.py > "karpenter-labels-$(date +"%Y-%m-%d").csv"
+# ./hack/github/label_issue_count.py > "karpenter-labels-$(date +"%Y-%m-%d").csv"
 writer = csv.writer(sys.stdout)
 writer.writerows(label_row_list)
 